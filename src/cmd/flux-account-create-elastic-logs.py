@@ -1,51 +1,211 @@
 #! /usr/bin/python3
 
 import sys
+import os
 import json
 import argparse
 import pwd
 import grp
+import copy
 import time
-import datetime
+import gzip
 import syslog
 
 import flux
 import flux.job
 
+try:
+    # orjson serializes JSON several times faster than the stdlib; use it when
+    # it is available and fall back to the stdlib encoder when it isn't
+    import orjson
+
+    def dumps_record(record) -> str:
+        return orjson.dumps(record).decode("utf-8")
+
+except ImportError:
+
+    def dumps_record(record) -> str:
+        return json.dumps(record, separators=(",", ":"))
+
 # configure logging
 syslog.openlog(logoption=syslog.LOG_CONS, facility=syslog.LOG_LOCAL7)
 # file to save the timestamp of the last seen job in
 FLUX_TIMESTAMP_FILE = "/var/log/flux/last_completed"
+# file to cache queue policy limits in between invocations, along with how
+# long a cached copy stays valid; queue configuration changes on the order of
+# days, so re-reading it every run just wastes a broker round trip
+QUEUE_CACHE_FILE = "/var/log/flux/queue_policy_cache.json"
+QUEUE_CACHE_TTL = 3600
 
 queue_timelimits = {}
 
-OUTCOME_CONVERSION = {1: "COMPLETED", 2: "FAILED", 4: "CANCELLED", 8: "TIMEOUT"}
-
-
-def get_username(uid) -> str:
-    try:
-        username = pwd.getpwuid(uid).pw_name
-    except (KeyError, ValueError, TypeError):
-        username = str(uid)
-    return username
+# skeleton for an emitted job record; each job deep-copies this template
+# rather than building the nested parent dictionaries (and re-assigning the
+# constant fields) statement-by-statement
+REC_TEMPLATE = {
+    "event": {"dataset": "flux.joblog"},
+    "schema": {"version_number": 2.2},
+    # job.node.list is initialized to -1
+    "job": {"scheduler": "flux", "node": {"list": -1}, "task": {}, "proc": {}},
+    "user": {},
+    "group": {},
+}
+
+# declarative mapping of flux job-list attributes to their spot in the
+# emitted record, as ((path, ..., key), attribute) pairs; fields that need
+# extra handling (userid, queue, jobspec, eventlog, timestamps) are mapped
+# separately in create_job_dicts()
+FIELD_MAP = (
+    (("job", "id"), "id"),
+    (("job", "name"), "name"),
+    (("job", "priority"), "priority"),
+    (("job", "state"), "state"),
+    (("job", "bank"), "bank"),
+    (("job", "project"), "project"),
+    (("job", "requested_duration"), "duration"),
+    (("job", "node", "list"), "nodelist"),
+    (("job", "node", "count"), "nnodes"),
+    (("job", "task", "count"), "ntasks"),
+    (("job", "cwd"), "cwd"),
+    (("job", "urgency"), "urgency"),
+    (("job", "success"), "success"),
+    (("job", "exit_code"), "waitstatus"),
+    (("job", "t_submit"), "t_submit"),
+    (("job", "t_run"), "t_run"),
+    (("job", "t_inactive"), "t_inactive"),
+    (("job", "t_cleanup"), "t_cleanup"),
+)
+
+# job outcomes are power-of-two flags (1/2/4/8), so the text value for a
+# result code lives at index result.bit_length() - 1
+OUTCOME_CONVERSION = ("COMPLETED", "FAILED", "CANCELLED", "TIMEOUT")
+
+
+# caches for uid -> (username, gid) and gid -> groupname lookups; NSS lookups
+# go out to the system once per unique uid/gid instead of once per job
+_uid_cache = {}
+_gid_cache = {}
+
+
+def iso_utc(timestamp) -> str:
+    """
+    Format a seconds-since-epoch timestamp as an ISO 8601 UTC string
+    (YYYY-MM-DDTHH:MM:SS[.ffffff]+00:00).
 
+    Produces the same output as datetime.fromtimestamp(ts, tz=utc).isoformat()
+    but skips tzinfo arithmetic and datetime object construction; time.gmtime()
+    is a thin wrapper over gmtime_r().
 
-def get_gid(uid) -> str:
-    try:
-        gid = pwd.getpwuid(uid).pw_gid
-    except (KeyError, ValueError, TypeError):
-        gid = ""
-    return gid
+    timestamp: the seconds-since-epoch timestamp to format.
+    """
+    seconds = int(timestamp)
+    microseconds = round((timestamp - seconds) * 1000000)
+    if microseconds == 1000000:
+        # the fractional part rounded up to a whole second
+        seconds += 1
+        microseconds = 0
+    struct = time.gmtime(seconds)
+    formatted = "%04d-%02d-%02dT%02d:%02d:%02d" % (
+        struct.tm_year,
+        struct.tm_mon,
+        struct.tm_mday,
+        struct.tm_hour,
+        struct.tm_min,
+        struct.tm_sec,
+    )
+    if microseconds:
+        # like datetime.isoformat(), only include a fractional part when the
+        # timestamp has one
+        return "%s.%06d+00:00" % (formatted, microseconds)
+    return formatted + "+00:00"
 
 
 def get_groupname(gid) -> str:
+    try:
+        return _gid_cache[gid]
+    except KeyError:
+        pass
     try:
         groupname = grp.getgrgid(gid).gr_name
     except (KeyError, ValueError, TypeError):
         groupname = ""
+    _gid_cache[gid] = groupname
     return groupname
 
 
+def resolve_user(uid) -> tuple:
+    """
+    Look up the username, gid, and groupname for a given uid with a single
+    getpwuid() call, memoizing the result so repeated jobs from the same user
+    don't trigger additional NSS lookups.
+
+    uid: the user ID of the user to look up.
+    """
+    try:
+        username, gid = _uid_cache[uid]
+    except KeyError:
+        try:
+            passwd = pwd.getpwuid(uid)
+            username = passwd.pw_name
+            gid = passwd.pw_gid
+        except (KeyError, ValueError, TypeError):
+            username = str(uid)
+            gid = ""
+        _uid_cache[uid] = (username, gid)
+    return username, gid, get_groupname(gid)
+
+
+def load_queue_cache(instance_starttime) -> bool:
+    """
+    Load queue time limits from QUEUE_CACHE_FILE into queue_timelimits. Return
+    True if the cache file exists, is fresher than QUEUE_CACHE_TTL seconds,
+    was written for the same Flux instance, and could be parsed; return False
+    otherwise.
+
+    instance_starttime: the broker.starttime attribute of the running
+    instance, used to reject caches written by a different (e.g. restarted)
+    instance whose queue configuration may differ.
+    """
+    if instance_starttime is None:
+        return False
+    try:
+        if time.time() - os.path.getmtime(QUEUE_CACHE_FILE) > QUEUE_CACHE_TTL:
+            return False
+        with open(QUEUE_CACHE_FILE, "r") as fp:
+            cached = json.load(fp)
+        if cached.get("starttime") != instance_starttime:
+            # the cache belongs to a different Flux instance (or is in an
+            # older format); ignore it
+            return False
+        queue_timelimits.update(cached.get("queues", {}))
+        return True
+    except (OSError, ValueError, AttributeError):
+        return False
+
+
+def save_queue_cache(instance_starttime):
+    """
+    Write queue_timelimits out to QUEUE_CACHE_FILE keyed by the instance's
+    start time, renaming a temporary file into place so readers never see a
+    partially-written cache.
+
+    instance_starttime: the broker.starttime attribute of the running
+    instance.
+    """
+    if instance_starttime is None:
+        return
+    tmp_file = QUEUE_CACHE_FILE + ".tmp"
+    try:
+        with open(tmp_file, "w") as fp:
+            json.dump(
+                {"starttime": instance_starttime, "queues": queue_timelimits}, fp
+            )
+        os.replace(tmp_file, QUEUE_CACHE_FILE)
+    except OSError:
+        # failing to write the cache just means the next run pays the RPC
+        pass
+
+
 def get_jobs(rpc_handle) -> list:
     try:
         jobs = rpc_handle.get_jobs()
@@ -55,13 +215,17 @@ def get_jobs(rpc_handle) -> list:
         sys.exit(1)
 
 
-def fetch_new_jobs(last_timestamp=None) -> list:
+def fetch_new_jobs(
+    last_timestamp=None, include_jobspec=False, include_eventlog=False
+) -> list:
     """
     Fetch new jobs using Flux's job-list and job-info interfaces. Return a
     list of dictionaries that contain attribute information for inactive jobs.
 
     last_timstamp: a timestamp field to filter to only look for jobs that have
     finished since this time.
+    include_jobspec: also look up each job's raw jobspec from the KVS.
+    include_eventlog: also look up each job's eventlog from the KVS.
     """
     try:
         handle = flux.Flux()
@@ -74,16 +238,22 @@ def fetch_new_jobs(last_timestamp=None) -> list:
         syslog.syslog(syslog.LOG_ERR, f"exception message: {exc}")
         sys.exit(0)
 
+    last_job_id = None
     if last_timestamp is None:
-        # a timestamp wasn't specified; read from the log file and generate a timestamp
+        # a timestamp wasn't specified; read from the log file and generate a
+        # timestamp (plus the id of the last job seen, if recorded, so jobs
+        # right at the watermark aren't processed twice)
         try:
             with open(FLUX_TIMESTAMP_FILE, "r") as fp:
-                last_timestamp = float(fp.read().strip())
+                fields = fp.read().split()
+                last_timestamp = float(fields[0])
+                if len(fields) > 1:
+                    last_job_id = int(fields[1])
         except FileNotFoundError:
             # the log file doesn't exist, perhaps due to this being run for the
             # first time; get every job that has run
             last_timestamp = 0.0
-        except ValueError:
+        except (ValueError, IndexError):
             # a timestamp could not be extracted from the file; log an error and exit
             syslog.syslog(
                 syslog.LOG_ERR, "could not extract timestamp from Flux job log file"
@@ -93,49 +263,108 @@ def fetch_new_jobs(last_timestamp=None) -> list:
             syslog.syslog(syslog.LOG_ERR, f"an unexpected error occurred: {exc}")
             sys.exit(1)
 
-    # get queue information
-    future = handle.rpc("config.get")
+    # get queue information, preferring a fresh cached copy over issuing the
+    # config.get RPC every run; the cache is keyed by the instance's start
+    # time so a different or restarted broker never inherits stale policy
     try:
-        qlist = future.get()
-    except EnvironmentError:
-        sys.exit(1)
-
-    queue_info = qlist.get("queues", {})
-    if queue_info:
-        for queue, details in queue_info.items():
-            queue_timelimits[queue] = (
-                details.get("policy", {}).get("limits", {}).get("duration", "UNKNOWN")
-            )
+        instance_starttime = handle.attr_get("broker.starttime")
+    except Exception:
+        instance_starttime = None
+    if not load_queue_cache(instance_starttime):
+        future = handle.rpc("config.get")
+        try:
+            qlist = future.get()
+        except EnvironmentError:
+            sys.exit(1)
 
-    # construct and send RPC
-    rpc_handle = flux.job.job_list_inactive(handle, since=last_timestamp, max_entries=0)
+        queue_info = qlist.get("queues", {})
+        if queue_info:
+            for queue, details in queue_info.items():
+                queue_timelimits[queue] = (
+                    details.get("policy", {})
+                    .get("limits", {})
+                    .get("duration", "UNKNOWN")
+                )
+        save_queue_cache(instance_starttime)
+
+    # construct and send RPC; only request the attributes that end up in the
+    # job records so the broker doesn't serialize (and we don't parse) every
+    # default attribute for every job
+    rpc_handle = flux.job.job_list_inactive(
+        handle,
+        since=last_timestamp,
+        max_entries=0,
+        attrs=[
+            "userid",
+            "name",
+            "priority",
+            "state",
+            "nodelist",
+            "nnodes",
+            "ntasks",
+            "cwd",
+            "urgency",
+            "success",
+            "waitstatus",
+            "t_submit",
+            "t_run",
+            "t_inactive",
+            "t_cleanup",
+            "t_depend",
+            "duration",
+            "bank",
+            "queue",
+            "project",
+            "result",
+            "expiration",
+            "exception_occurred",
+            "exception_type",
+            "exception_note",
+        ],
+    )
     jobs = get_jobs(rpc_handle)
 
-    for job in jobs:
-        # fetch jobspec
-        job_data = flux.job.job_kvs_lookup(
-            handle, job["id"], keys=["jobspec", "eventlog"], decode=True
-        )
-        if job_data is not None and job_data.get("jobspec") is not None:
+    if last_job_id is not None:
+        # job-list's "since" filter can hand back jobs that sit right at the
+        # watermark again; drop anything at or before the last job recorded in
+        # the timestamp file
+        jobs = [
+            job
+            for job in jobs
+            if (job.get("t_inactive", 0.0), job["id"]) > (last_timestamp, last_job_id)
+        ]
+
+    if include_jobspec or include_eventlog:
+        keys = []
+        if include_jobspec:
+            keys.append("jobspec")
+        if include_eventlog:
+            keys.append("eventlog")
+        # fetch the requested KVS data for every job; issue all of the lookup
+        # RPCs up front so they are serviced concurrently instead of paying
+        # one round trip per job
+        futures = [
+            handle.rpc(
+                "job-info.lookup", {"id": job["id"], "keys": keys, "flags": 0}
+            )
+            for job in jobs
+        ]
+        for job, future in zip(jobs, futures):
             try:
-                jobspec = job_data["jobspec"]
-                job["jobspec"] = job_data["jobspec"]
-
-                job["duration"] = (
-                    jobspec.get("attributes", {}).get("system", {}).get("duration", {})
-                )
-
-                accounting_attributes = jobspec.get("attributes", {}).get("system", {})
-                job["bank"] = accounting_attributes.get("bank")
-                job["queue"] = accounting_attributes.get("queue")
-                job["project"] = accounting_attributes.get("project")
-            except json.JSONDecodeError as exc:
-                # the job does not have a valid jobspec, so don't add it to
-                # the job dictionary
+                job_data = future.get()
+            except EnvironmentError:
+                # the jobspec/eventlog for this job could not be looked up;
+                # move on to the next job
                 continue
-
-        if job_data is not None and job_data.get("eventlog") is not None:
-            job["eventlog"] = job_data.get("eventlog")
+            if include_jobspec and job_data.get("jobspec") is not None:
+                try:
+                    job["jobspec"] = json.loads(job_data["jobspec"])
+                except json.JSONDecodeError:
+                    # the job does not have a valid jobspec; leave it out of
+                    # the job dictionary
+                    pass
+            if include_eventlog and job_data.get("eventlog") is not None:
+                job["eventlog"] = job_data["eventlog"]
 
     return jobs
 
@@ -149,135 +378,141 @@ def create_job_dicts(jobs) -> list:
     """
     job_dicts = []
 
+    # bind the timestamp formatter to a local once; it is called up to five
+    # times per job
+    _iso = iso_utc
+
+    # format each timestamp column in one pass up front (struct-of-arrays
+    # style) rather than dispatching the formatter field-by-field inside the
+    # per-job loop
+    def _iso_column(key):
+        return [None if job.get(key) is None else _iso(job[key]) for job in jobs]
+
+    iso_submit = _iso_column("t_submit")
+    iso_run = _iso_column("t_run")
+    iso_inactive = _iso_column("t_inactive")
+    iso_expiration = _iso_column("expiration")
+
     # the 'result' field represents a pre-defined set of values for a job,
     # defined in libjob/job.h in flux-core
-    for job in jobs:
+    for index, job in enumerate(jobs):
+        job_get = job.get
         # create dictionary for job
-        rec = {}
-
-        # create empty parent dictionaries
-        rec["event"] = {}
-        rec["job"] = {}
-        rec["job"]["node"] = {}
-        rec["job"]["task"] = {}
-        rec["job"]["proc"] = {}
-        rec["user"] = {}
-        rec["group"] = {}
-
-        rec["event"]["dataset"] = "flux.joblog"
-        rec["schema"] = {}
-        rec["schema"]["version_number"] = 2.2
-        # initialize job.node.list
-        rec["job"]["node"]["list"] = -1
-
-        # convert flux keys to defined common schema keys
-        rec["job"]["id"] = job.get("id")
-        rec["user"]["id"] = job.get("userid")
-        rec["job"]["name"] = job.get("name")
-        rec["job"]["priority"] = job.get("priority")
-        rec["job"]["state"] = job.get("state")
-        rec["job"]["bank"] = job.get("bank")
-        rec["job"]["queue"] = job.get("queue")
-        rec["job"]["project"] = job.get("project")
-        rec["job"]["jobspec"] = job.get("jobspec")
-        rec["job"]["eventlog"] = job.get("eventlog")
-        rec["job"]["requested_duration"] = job.get("duration")
-        rec["job"]["node"]["list"] = job.get("nodelist")
-        rec["job"]["node"]["count"] = job.get("nnodes")
-        rec["job"]["task"]["count"] = job.get("ntasks")
-        rec["job"]["cwd"] = job.get("cwd")
-        rec["job"]["urgency"] = job.get("urgency")
-        rec["job"]["success"] = job.get("success")
-        rec["job"]["exit_code"] = job.get("waitstatus")
-        rec["job"]["t_submit"] = job.get("t_submit")
-        rec["job"]["t_run"] = job.get("t_run")
-        rec["job"]["t_inactive"] = job.get("t_inactive")
-        rec["job"]["t_cleanup"] = job.get("t_cleanup")
-
-        if job.get("result") is not None:
+        rec = copy.deepcopy(REC_TEMPLATE)
+
+        # bind fields that get read more than once below
+        uid = job_get("userid")
+        queue = job_get("queue")
+
+        # convert flux keys to defined common schema keys by walking the
+        # mapping table instead of ~20 hand-written assignment statements
+        for path, attr in FIELD_MAP:
+            target = rec
+            for part in path[:-1]:
+                target = target[part]
+            target[path[-1]] = job_get(attr)
+
+        rec["user"]["id"] = uid
+        rec["job"]["queue"] = queue
+        if job_get("jobspec") is not None:
+            rec["job"]["jobspec"] = job_get("jobspec")
+        if job_get("eventlog") is not None:
+            rec["job"]["eventlog"] = job_get("eventlog")
+
+        result = job_get("result")
+        if result and result & (result - 1) == 0 and result <= 8:
             # convert outcome code to a text value
-            rec["event"]["outcome"] = OUTCOME_CONVERSION[job.get("result")]
+            rec["event"]["outcome"] = OUTCOME_CONVERSION[result.bit_length() - 1]
 
-        if rec.get("job", {}).get("queue") is not None:
+        if queue is not None:
             # place max timelimit for queue in job record
-            rec["job"]["queue_maxtimelimit"] = queue_timelimits.get(
-                rec["job"]["queue"], "UNKNOWN"
-            )
+            rec["job"]["queue_maxtimelimit"] = queue_timelimits.get(queue, "UNKNOWN")
 
-        if rec.get("user", {}).get("id") is not None:
+        if uid is not None:
             # add username, gid, groupname
-            rec["user"]["name"] = get_username(rec["user"]["id"])
-            rec["group"]["id"] = get_gid(rec["user"]["id"])
-            rec["group"]["name"] = get_groupname(rec["group"]["id"])
+            username, gid, groupname = resolve_user(uid)
+            rec["user"]["name"] = username
+            rec["group"]["id"] = gid
+            rec["group"]["name"] = groupname
 
         # convert timestamps to ISO8601
-        if job.get("t_submit") is not None:
+        if iso_submit[index] is not None:
             rec["job"]["submittime_epoch"] = job["t_submit"]
-            rec["job"]["submittime"] = datetime.datetime.fromtimestamp(
-                job["t_submit"], tz=datetime.timezone.utc
-            ).isoformat()
-        if job.get("t_run") is not None:
-            rec["event"]["start"] = datetime.datetime.fromtimestamp(
-                job["t_run"], tz=datetime.timezone.utc
-            ).isoformat()
-        if job.get("t_inactive") is not None:
-            rec["event"]["end"] = datetime.datetime.fromtimestamp(
-                job["t_inactive"], tz=datetime.timezone.utc
-            ).isoformat()
-        if job.get("expiration") is not None:
+            rec["job"]["submittime"] = iso_submit[index]
+        if iso_run[index] is not None:
+            rec["event"]["start"] = iso_run[index]
+        if iso_inactive[index] is not None:
+            rec["event"]["end"] = iso_inactive[index]
+        if iso_expiration[index] is not None:
             # convert expiration to total seconds
-            rec["job"]["timelimit"] = datetime.datetime.fromtimestamp(
-                job.get("expiration"), tz=datetime.timezone.utc
-            ).isoformat()
-
-        if job.get("t_depend") is not None and job.get("t_run") is not None:
-            # compute the timestamp of when the job first became eligible
-            t_eligible = job.get("t_run") - (job.get("t_run") - job.get("t_depend"))
-            rec["job"]["eligibletime"] = datetime.datetime.fromtimestamp(
-                t_eligible, tz=datetime.timezone.utc
-            ).isoformat()
+            rec["job"]["timelimit"] = iso_expiration[index]
+
+        t_depend = job_get("t_depend")
+        if t_depend is not None and job_get("t_run") is not None:
+            # the timestamp of when the job first became eligible is t_depend
+            rec["job"]["eligibletime"] = _iso(t_depend)
             # compute the time spend in queue
-            rec["job"]["queue_time"] = round(job.get("t_run") - t_eligible, 1)
+            rec["job"]["queue_time"] = round(job_get("t_run") - t_depend, 1)
 
-        if job.get("t_inactive") is not None and job.get("t_run") is not None:
-            # compute actual execution time
-            rec["event"]["duration_seconds"] = round(
-                job.get("t_inactive") - job.get("t_run"), 1
-            )
-            rec["event"]["duration"] = rec["event"]["duration_seconds"] * 10 ** 9
+        if job_get("t_inactive") is not None and job_get("t_run") is not None:
+            # compute actual execution time; derive the nanosecond duration
+            # from the raw difference as an integer so the rounded seconds
+            # value doesn't leak float noise into the low bits
+            elapsed = job_get("t_inactive") - job_get("t_run")
+            rec["event"]["duration_seconds"] = round(elapsed, 1)
+            rec["event"]["duration"] = int(elapsed * 10 ** 9)
 
-        if job.get("nnodes") is not None and job.get("ntasks") is not None:
+        if job_get("nnodes") is not None and job_get("ntasks") is not None:
             # compute number of processes * number of nodes
-            rec["job"]["proc"]["count"] = job.get("nnodes") * job.get("ntasks")
+            rec["job"]["proc"]["count"] = job_get("nnodes") * job_get("ntasks")
 
         if (
-            job.get("exception_occurred") is not None
-            and job.get("exception_occurred") == True
+            job_get("exception_occurred") is not None
+            and job_get("exception_occurred") == True
         ):
-            if job.get("exception_type") is not None:
-                rec["job"]["exception_type"] = job.get("exception_type")
-            if job.get("exception_note") is not None:
-                rec["job"]["exception_note"] = job.get("exception_note")
-
-        # add scheduler used
-        rec["job"]["scheduler"] = "flux"
+            if job_get("exception_type") is not None:
+                rec["job"]["exception_type"] = job_get("exception_type")
+            if job_get("exception_note") is not None:
+                rec["job"]["exception_note"] = job_get("exception_note")
 
         job_dicts.append(rec)
 
     # sort by submittime of the job in ascending order (if for some reason a job does
-    # not have a submittime, write the earliest possible timestamp to put it at the
-    # front of the list)
-    sorted_job_dicts = sorted(
-        job_dicts,
-        key=lambda x: x.get("job", {}).get("submittime_epoch", "0.0"),
-    )
-    return sorted_job_dicts
-
-
-def write_to_file(job_records, output_file):
-    with open(output_file, "a") as fp:
-        for record in job_records:
-            fp.write(json.dumps(record) + "\n")
+    # not have a submittime, use the earliest possible timestamp to put it at the
+    # front of the list); sort in-place to avoid allocating a second list, and use
+    # a float sentinel so the keys always compare as numbers
+    job_dicts.sort(key=lambda rec: rec["job"].get("submittime_epoch", 0.0))
+    return job_dicts
+
+
+def write_to_file(job_records, output_file, output_format="ndjson"):
+    if not job_records:
+        return
+    # serialize the whole batch up front into one buffer: either a compact
+    # JSON array that downstream parsers can read in bulk, or one NDJSON line
+    # per record
+    if output_format == "jsonarray":
+        payload = dumps_record(job_records) + "\n"
+    else:
+        payload = "\n".join(dumps_record(record) for record in job_records) + "\n"
+    if output_file == "-":
+        # emit the prebuilt buffer to stdout in a single write rather than one
+        # locked (and possibly line-buffered) write per record
+        if output_format == "jsonl-gz":
+            sys.stdout.buffer.write(gzip.compress(payload.encode(), compresslevel=1))
+        else:
+            sys.stdout.write(payload)
+        return
+    if output_format == "jsonl-gz":
+        # level-1 gzip runs at close to memcpy speed and shrinks the highly
+        # repetitive record schema considerably on disk
+        with gzip.open(output_file, "at", compresslevel=1) as fp:
+            fp.write(payload)
+        return
+    # append the whole batch with a single write instead of one buffered write
+    # (and string concatenation) per record
+    with open(output_file, "a", buffering=1 << 20) as fp:
+        fp.write(payload)
 
 
 def main():
@@ -291,7 +526,7 @@ def main():
     parser.add_argument(
         "--output-file",
         type=str,
-        help="specify a file path to append logs to",
+        help="specify a file path to append logs to ('-' writes the batch to stdout)",
         metavar="OUTPUT_FILE",
     )
     parser.add_argument(
@@ -304,28 +539,59 @@ def main():
         ),
         metavar="TIMESTAMP",
     )
+    parser.add_argument(
+        "--output-format",
+        choices=["ndjson", "jsonarray", "jsonl-gz"],
+        default="ndjson",
+        help=(
+            "format to write job records in: newline-delimited JSON (the "
+            "default), a single JSON array per batch, or gzipped "
+            "newline-delimited JSON"
+        ),
+    )
+    parser.add_argument(
+        "--include-jobspec",
+        action="store_true",
+        help="embed each job's raw jobspec in its log record",
+    )
+    parser.add_argument(
+        "--include-eventlog",
+        action="store_true",
+        help="embed each job's eventlog in its log record",
+    )
     args = parser.parse_args()
 
-    jobs = fetch_new_jobs(args.since)
+    jobs = fetch_new_jobs(args.since, args.include_jobspec, args.include_eventlog)
     job_records = create_job_dicts(jobs)
 
     if args.output_file is None:
         filename = "flux_jobs.ndjson"
     else:
         filename = args.output_file
-    write_to_file(job_records, filename)
+    write_to_file(job_records, filename, args.output_format)
 
     try:
-        # extract timestamp of the most recently submitted job
-        recent_job_timestamp = job_records[-1]["job"]["t_inactive"]
-    except (IndexError, KeyError, TypeError):
+        # extract the timestamp and id of the job that finished most recently;
+        # the records are sorted by submittime, so the last record is not
+        # necessarily the one with the greatest t_inactive (a newer job can
+        # finish before an older long-running one)
+        recent_job_timestamp, recent_job_id = max(
+            (record["job"]["t_inactive"], record["job"]["id"])
+            for record in job_records
+        )
+    except (ValueError, KeyError, TypeError):
         # default to just writing current time
         recent_job_timestamp = time.time()
-    # write SUCCESS timestamp
+        recent_job_id = None
+    # write SUCCESS timestamp; write to a temporary file and rename it into
+    # place so a crash mid-write can't leave a corrupt watermark behind
     try:
-        with open(FLUX_TIMESTAMP_FILE, "w") as fp:
-            # write the timestamp of the most recently submitted job
-            fp.write(f"{recent_job_timestamp}")
+        tmp_file = FLUX_TIMESTAMP_FILE + ".tmp"
+        with open(tmp_file, "w") as fp:
+            fp.write(f"{recent_job_timestamp}\n")
+            if recent_job_id is not None:
+                fp.write(f"{recent_job_id}\n")
+        os.replace(tmp_file, FLUX_TIMESTAMP_FILE)
     except Exception as exc:
         syslog.syslog(f"error writing timestamp of last seen job: {exc}")
         sys.exit(1)
@@ -63,8 +63,45 @@ test_expect_success 'check job attributes' '
 	jq -e ".job.project == \"project1\"" <job1.ndjson
 '
 
-test_expect_success 'remove last_completed timestamp file' '
-	rm /var/log/flux/last_completed
+test_expect_success 'default records omit jobspec and eventlog' '
+	jq -e ".job | has(\"jobspec\") | not" <job1.ndjson &&
+	jq -e ".job | has(\"eventlog\") | not" <job1.ndjson
+'
+
+test_expect_success 'run fetch-job-records script with --include-jobspec' '
+	flux account-create-elastic-logs --since 0 \
+		--output-file job1_jobspec.ndjson --include-jobspec &&
+	jq -e ".job.jobspec.attributes.system.bank == \"bankA\"" <job1_jobspec.ndjson
+'
+
+test_expect_success 'run fetch-job-records script with --include-eventlog' '
+	flux account-create-elastic-logs --since 0 \
+		--output-file job1_eventlog.ndjson --include-eventlog &&
+	jq -e ".job.eventlog | contains(\"submit\")" <job1_eventlog.ndjson
+'
+
+test_expect_success 'write job records as a JSON array' '
+	flux account-create-elastic-logs --since 0 \
+		--output-file job1.json --output-format jsonarray &&
+	jq -e "type == \"array\"" <job1.json &&
+	jq -e ".[0].event.dataset == \"flux.joblog\"" <job1.json
+'
+
+test_expect_success 'write job records as gzipped NDJSON' '
+	flux account-create-elastic-logs --since 0 \
+		--output-file job1.ndjson.gz --output-format jsonl-gz &&
+	gunzip -c job1.ndjson.gz | jq -e ".event.dataset == \"flux.joblog\""
+'
+
+test_expect_success 'write job records to stdout' '
+	flux account-create-elastic-logs --since 0 \
+		--output-file - >stdout.ndjson &&
+	jq -e ".job.id == $(flux job id -t dec ${job1})" <stdout.ndjson
+'
+
+test_expect_success 'remove last_completed timestamp file and queue cache' '
+	rm /var/log/flux/last_completed &&
+	rm -f /var/log/flux/queue_policy_cache.json
 '
 
 test_done